@@ -3,17 +3,30 @@
 Core trading logic (hotkey-driven, personality logs)
 """
 
-import json
+import collections
+import functools
+import heapq
+import itertools
 import logging
+import os
+import queue
 import threading
 import time
 import random
-import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
-import pyautogui
+
+try:
+    from Xlib import X, XK
+    from Xlib.display import Display
+    from Xlib.ext import xtest
+except ImportError:
+    Display = None  # non-X11 host: hotkeys go through pyautogui
 
 import shared  # 👈 shared singleton
+from core_utils import random_log  # personality lines from logs.json
 
 # ---------------------------
 # Configuration
@@ -25,8 +38,12 @@ TIMEFRAME_SECONDS = {
     "M30": 1800,
     "H1": 3600
 }
-EXPIRY_BUFFER_SECONDS = 5
-pyautogui.FAILSAFE = False
+EXPIRY_BUFFER_SECONDS = 30  # after win_loss's post-expiry window: room for a full detection pass (template match + OCR)
+TRADE_WORKERS = 8  # pool for entries, timeouts and result handling; no task parks for a trade's expiry
+SCHED_SPIN_SECONDS = 0.002  # final stretch before an entry is spun on the clock, not slept
+SCHED_RT_PRIORITY = 50  # SCHED_FIFO priority for timing-critical threads (needs CAP_SYS_NICE)
+SIGNAL_DEDUP_SECONDS = 5.0  # a repeat of the same pair/entry/direction within this window is dropped
+SIGNAL_DEDUP_MAX = 128
 
 # ---------------------------
 # Logging
@@ -38,51 +55,299 @@ logging.basicConfig(
 )
 logger = logging.getLogger("core")
 
-# ---------------------------
-# Load personality logs
-# ---------------------------
-try:
-    with open("logs.json", "r", encoding="utf-8") as f:
-        LOG_BUCKETS = json.load(f)
-except Exception as e:
-    logger.warning(f"[⚠️] Failed to load logs.json: {e}. Using minimal defaults.")
-    LOG_BUCKETS = {
-        "idle_logs": ["Precision is idling."],
-        "pre_trade_logs": ["Precision preparing trade."],
-        "firing_logs": ["Precision firing."],
-        "martingale_logs": ["Martingale engaged."],
-        "win_logs": ["Win!"],
-        "loss_logs": ["Loss."],
-        "praise_desmond": ["Desmond is great."],
-        "roast_others": ["Look at others."],
-        "questions": ["What's next?"]
-    }
-
-def _random_log(category: str) -> str:
-    bucket = LOG_BUCKETS.get(category, None)
-    if not bucket:
-        return ""
-    return random.choice(bucket)
+def _log_flavor(category: str):
+    """Emit a personality line at INFO; skips the random pick entirely when INFO is off."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(random_log(category))
 
 # ---------------------------
 # Thread-safe registries
 # ---------------------------
-_registry_lock = threading.RLock()
+# Two plain locks instead of one registry-wide RLock. When both are needed, take
+# _groups_lock first. Single get/pop calls and item writes are atomic dict ops and
+# need no lock: the locks only guard multi-step updates (check-then-register,
+# the scheduled counter, and picking the newest pending trade).
+_pending_lock = threading.Lock()
+_groups_lock = threading.Lock()
 _pending_trades = {}
 _active_groups = {}
 
+@dataclass(slots=True)
+class PendingTrade:
+    # Lives in _pending_trades from registration until its result or timeout; slots keep it small
+    id: str
+    currency: str
+    direction: str
+    timeframe: str
+    group_id: str
+    martingale_level: int
+    placed_at: Optional[float] = None
+    result: Optional[str] = None
+
+def _release_group(group_id: str, count: int = 1):
+    # Drop a signal's group once its last scheduled trade is done, so finished signals don't accumulate
+    with _groups_lock:
+        grp = _active_groups.get(group_id)
+        if grp is None:
+            return
+        grp["scheduled"] -= count
+        if grp["scheduled"] <= 0:
+            _active_groups.pop(group_id, None)
+
+def _stop_group(group_id: str):
+    # One item write; a trade registering concurrently either sees it or was already placed
+    grp = _active_groups.get(group_id)
+    if grp is not None:
+        grp["stopped"] = True
+
 # ---------------------------
-# Utilities
+# Real-time priority (best effort)
 # ---------------------------
-def _tf_to_seconds(tf: str) -> int:
-    if not tf:
-        return 60
-    return TIMEFRAME_SECONDS.get(tf.strip().upper(), 60)
+def _try_realtime_priority():
+    """
+    Moves the calling thread to SCHED_FIFO so its wakeups aren't delayed by CFS.
+    Silently stays on the default policy without CAP_SYS_NICE or off Linux.
+    """
+    if not hasattr(os, "sched_setscheduler"):
+        return
+    try:
+        os.sched_setscheduler(threading.get_native_id(), os.SCHED_FIFO, os.sched_param(SCHED_RT_PRIORITY))
+        logger.info("[⚡] %s: SCHED_FIFO priority %d", threading.current_thread().name, SCHED_RT_PRIORITY)
+    except (PermissionError, OSError) as e:
+        logger.debug("[ℹ️] %s: SCHED_FIFO unavailable (%s)", threading.current_thread().name, e)
+
+def _drop_realtime_priority():
+    """
+    Puts the calling thread back on SCHED_OTHER. Linux threads inherit their
+    creator's policy, so workers spawned by an RT thread would otherwise run RT.
+    """
+    if not hasattr(os, "sched_setscheduler"):
+        return
+    try:
+        os.sched_setscheduler(threading.get_native_id(), os.SCHED_OTHER, os.sched_param(0))
+    except (PermissionError, OSError):
+        pass
+
+# ---------------------------
+# Hotkey dispatch
+# ---------------------------
+# Every trade thread sends its keys through this single worker, so shift-chords
+# from concurrent trades are queued in order instead of interleaving in pyautogui.
+_hotkey_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hotkey",
+                                      initializer=_try_realtime_priority)
+
+class _XTestKeyboard:
+    """
+    Sends a whole chord through XTest with one round-trip to the X server
+    (pyautogui syncs after every single key event). Keycodes are resolved once.
+    Only used from the hotkey worker thread, so the Display is never shared.
+    """
+    _KEYSYMS = {"shift": "Shift_L", "ctrl": "Control_L", "alt": "Alt_L"}
+
+    def __init__(self):
+        self._display = Display()
+        self._keycodes = {}
+        self._chords = {}  # key names -> keycode tuple
+
+    def _keycode(self, key: str) -> int:
+        code = self._keycodes.get(key)
+        if code is None:
+            code = self._display.keysym_to_keycode(XK.string_to_keysym(self._KEYSYMS.get(key, key)))
+            if not code:
+                raise ValueError(f"No X11 keycode for key {key!r}")
+            self._keycodes[key] = code
+        return code
+
+    def prepare(self, *keys):
+        codes = self._chords.get(keys)
+        if codes is None:
+            codes = self._chords[keys] = tuple(self._keycode(k) for k in keys)
+        return codes
+
+    def hotkey(self, *keys):
+        codes = self.prepare(*keys)
+        for code in codes:
+            xtest.fake_input(self._display, X.KeyPress, code)
+        for code in reversed(codes):
+            xtest.fake_input(self._display, X.KeyRelease, code)
+        self._display.sync()
+
+_BUY_CHORD = ("shift", "w")
+_SELL_CHORD = ("shift", "s")
+_INCREASE_CHORD = ("shift", "d")
+# Entry chord by upper-cased direction; any other direction sells, as it always has
+_ENTRY_CHORDS = {"BUY": _BUY_CHORD, "CALL": _BUY_CHORD, "SELL": _SELL_CHORD, "PUT": _SELL_CHORD}
+# Every chord a trade sends
+_TRADE_CHORDS = (_BUY_CHORD, _SELL_CHORD, _INCREASE_CHORD)
+
+_keyboard = None
+_pyautogui = None
+
+def _get_pyautogui():
+    """Import pyautogui only on hosts without XTest; its display probe is slow and otherwise unused."""
+    global _pyautogui
+    if _pyautogui is None:
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        pyautogui.PAUSE = 0  # the default 0.1s post-call sleep only delays the hotkey worker
+        _pyautogui = pyautogui
+    return _pyautogui
 
+def _get_keyboard():
+    global _keyboard
+    if _keyboard is None:
+        try:
+            _keyboard = _XTestKeyboard() if Display is not None else False
+        except Exception as e:
+            logger.warning("[⚠️] XTest keyboard unavailable (%s); using pyautogui for hotkeys.", e)
+            _keyboard = False
+    return _keyboard
+
+def _warm_keyboard():
+    """Open the X connection and resolve the trade chords before the first entry."""
+    keyboard = _get_keyboard()
+    if keyboard:
+        for keys in _TRADE_CHORDS:
+            try:
+                keyboard.prepare(*keys)
+            except ValueError as e:
+                logger.warning("[⚠️] %s", e)
+    else:
+        _get_pyautogui()
+
+def _press_chord(*keys):
+    keyboard = _get_keyboard()
+    if keyboard:
+        keyboard.hotkey(*keys)
+    else:
+        _get_pyautogui().hotkey(*keys)
+
+def _send_hotkey(*keys):
+    _hotkey_executor.submit(_press_chord, *keys).result()
+
+# ---------------------------
+# Entry scheduler
+# ---------------------------
+class _Scheduler:
+    """
+    One daemon thread holding every upcoming trade entry in a min-heap keyed by
+    monotonic deadline. A trade waiting for its entry costs a heap slot, not a
+    sleeping thread; due entries are handed to a reusable worker pool so the
+    scheduler is never blocked by a trade's own work.
+    """
+    def __init__(self, max_workers: int = TRADE_WORKERS):
+        # Workers are spawned lazily by the RT scheduler thread; only the scheduler and hotkey threads stay RT
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="trade",
+                                        initializer=_drop_realtime_priority)
+        self._heap = []
+        self._seq = itertools.count()
+        self._cv = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="trade-scheduler", daemon=True)
+        self._thread.start()
+
+    def call_at(self, deadline: float, fn, *args):
+        with self._cv:
+            heapq.heappush(self._heap, (deadline, next(self._seq), None, False, fn, args))
+            self._cv.notify()
+
+    def call_at_many(self, entries, key=None, precise=False):
+        """
+        Push several (deadline, fn, args) entries under one lock acquisition and one wake-up.
+        precise entries (trade entries) spin the final SCHED_SPIN_SECONDS; others just wait.
+        """
+        with self._cv:
+            for deadline, fn, args in entries:
+                heapq.heappush(self._heap, (deadline, next(self._seq), key, precise, fn, args))
+            self._cv.notify()
+
+    def cancel(self, key) -> int:
+        """Drop every not-yet-due entry pushed under key; returns how many were dropped."""
+        with self._cv:
+            kept = [entry for entry in self._heap if entry[2] != key]
+            dropped = len(self._heap) - len(kept)
+            if dropped:
+                heapq.heapify(kept)
+                self._heap = kept
+        return dropped
+
+    def submit(self, fn, *args):
+        """Run fn on the worker pool now, bypassing the heap."""
+        self._pool.submit(fn, *args).add_done_callback(self._report_crash)
+
+    def _run(self):
+        _try_realtime_priority()
+        while True:
+            with self._cv:
+                while True:
+                    if not self._heap:
+                        self._cv.wait()
+                        continue
+                    head = self._heap[0]
+                    lead = SCHED_SPIN_SECONDS if head[3] else 0.0
+                    remaining = head[0] - time.monotonic()
+                    if remaining <= lead:
+                        break
+                    self._cv.wait(timeout=remaining - lead)
+                deadline, _, _, precise, fn, args = heapq.heappop(self._heap)
+            if precise:
+                # Timed waits overshoot by up to a scheduler tick; spin the last couple of ms outside the lock
+                while time.monotonic() < deadline:
+                    pass
+            self.submit(fn, *args)
+
+    @staticmethod
+    def _report_crash(future):
+        # The pool keeps worker exceptions on the future; surface them like a crashed thread would
+        exc = future.exception()
+        if exc is not None:
+            logger.error("[❌] Scheduled task crashed: %r", exc, exc_info=exc)
+
+# ---------------------------
+# Utilities
+# ---------------------------
+_rng_buf = bytearray()
+_rng_lock = threading.Lock()
+
+def _short_id(nbytes: int) -> str:
+    """Random hex id suffix, sliced from a pooled urandom buffer (one syscall per ~60 ids)."""
+    with _rng_lock:
+        if len(_rng_buf) < nbytes:
+            _rng_buf.extend(os.urandom(256))
+        chunk = _rng_buf[:nbytes]
+        del _rng_buf[:nbytes]
+    return chunk.hex()
+
+_PAIR_STRIP = str.maketrans("", "", "/ ")
+
+# Bounded: pairs come from free-form Telegram text, but the traded universe is small
+@functools.lru_cache(maxsize=256)
 def _normalize_currency(pair: str) -> str:
     if not pair:
         return ""
-    return pair.replace("/", "").replace(" ", "").upper()
+    return pair.translate(_PAIR_STRIP).upper()
+
+_screen_logic = None  # module once imported; False if it isn't available
+
+def _get_screen_logic():
+    """Import screen_logic on first use only; later signals skip the import machinery."""
+    global _screen_logic
+    if _screen_logic is None:
+        try:
+            import screen_logic
+            _screen_logic = screen_logic
+        except ImportError:
+            _screen_logic = False
+    return _screen_logic or None
+
+_win_loss = None  # set on the first successful import; a failed import is retried next trade
+
+def _get_win_loss():
+    """Import win_loss (OpenCV/OCR, heavy) on the first trade, then reuse the module."""
+    global _win_loss
+    if _win_loss is None:
+        import win_loss
+        _win_loss = win_loss
+    return _win_loss
 
 # ---------------------------
 # Trade Manager
@@ -90,196 +355,262 @@ def _normalize_currency(pair: str) -> str:
 class TradeManager:
     def __init__(self, max_martingale: int = 3):
         self.max_martingale = max_martingale
-        pyautogui.FAILSAFE = False
+        self._scheduler = _Scheduler()
+        _hotkey_executor.submit(_warm_keyboard)  # on the hotkey thread, which owns the Display
+        # Signals are handed off to one pump thread so the Telegram listener never waits on scheduling
+        self._signal_queue = queue.SimpleQueue()
+        self._recent_signals = collections.OrderedDict()  # (pair, entry, direction) -> monotonic; pump thread only
+        threading.Thread(target=self._signal_pump, name="signal-pump", daemon=True).start()
         logger.info("[ℹ️] TradeManager initialized.")
-        logger.info(_random_log("idle_logs"))
+        _log_flavor("idle_logs")
 
     def handle_signal(self, signal: dict):
+        self._signal_queue.put(signal)
+
+    def _signal_pump(self):
+        while True:
+            self._process_signal(self._signal_queue.get())
+
+    def _process_signal(self, signal: dict):
+        # Bound once per call; this runs for every signal
+        log_info, log_warning = logger.info, logger.warning
+        group_id = None
         try:
             currency_raw = signal.get("currency_pair")
             direction = (signal.get("direction") or "BUY").upper()
             entry_time = signal.get("entry_time")
             mg_times = signal.get("martingale_times", []) or []
-            timeframe = (signal.get("timeframe") or "M1").upper()
+            timeframe = (signal.get("timeframe") or "M1").strip().upper()
+            expiry_seconds = TIMEFRAME_SECONDS.get(timeframe, 60)  # resolved once for every level
 
             if not currency_raw or not isinstance(entry_time, datetime) or entry_time.tzinfo is None:
-                logger.warning("[⚠️] Invalid signal: missing currency or timezone-aware entry_time.")
+                log_warning("[⚠️] Invalid signal: missing currency or timezone-aware entry_time.")
                 return
 
             currency = _normalize_currency(currency_raw)
-            group_id = f"{currency}_{entry_time.isoformat()}_{uuid.uuid4().hex[:8]}"
+            if self._is_duplicate_signal((currency, entry_time, direction)):
+                log_info("[♻️] Duplicate signal for %s (%s) at %s ignored.", currency, direction, entry_time)
+                return
+            group_id = f"{currency}_{entry_time.isoformat()}_{_short_id(4)}"
 
-            with _registry_lock:
-                _active_groups[group_id] = {"stopped": False, "signal": signal}
+            with _groups_lock:
+                _active_groups[group_id] = {"stopped": False, "signal": signal, "scheduled": 0}
 
-            logger.info(f"[📩] Signal received for {currency_raw} ({direction}) at {entry_time.strftime('%H:%M:%S')} — scheduling (group={group_id})")
-            logger.info(_random_log("pre_trade_logs"))
+            if logger.isEnabledFor(logging.INFO):
+                log_info("[📩] Signal received for %s (%s) at %s — scheduling (group=%s)",
+                         currency_raw, direction, entry_time.strftime('%H:%M:%S'), group_id)
+            _log_flavor("pre_trade_logs")
 
-            # Fire-and-forget screen logic
+            # Fire-and-forget screen logic (once per signal; martingales reuse the same pair/timeframe)
             try:
-                import screen_logic
-                try:
-                    screen_logic.select_currency(currency, timeframe)
-                except TypeError:
-                    screen_logic.select_currency(currency)
-                logger.info(f"[🛰️] Instructed screen_logic to select {currency}/{timeframe}")
+                screen_logic = _get_screen_logic()
+                if screen_logic is None:
+                    raise ImportError("screen_logic")
+                screen_logic.select_currency(currency)
+                screen_logic.select_timeframe(timeframe)
+                log_info("[🛰️] Instructed screen_logic to select %s/%s", currency, timeframe)
             except Exception:
-                logger.info(f"[🛰️] screen_logic not available; continuing.")
-
-            # Schedule base trade
-            self._schedule_trade(entry_time, currency, direction, timeframe, group_id, martingale_level=0)
+                log_info("[🛰️] screen_logic not available; continuing.")
 
-            # Schedule martingales
+            # Base trade plus martingales, scheduled as one batch
+            entries = [(0, entry_time)]
             for idx, mg_time in enumerate(mg_times):
                 level = idx + 1
                 if level > self.max_martingale:
-                    logger.warning(f"[⚠️] Martingale time at level {level} exceeds max; skipping.")
+                    log_warning("[⚠️] Martingale time at level %d exceeds max; skipping.", level)
                     break
-                self._schedule_trade(mg_time, currency, direction, timeframe, group_id, martingale_level=level)
+                # Checked before the batch is built, so one bad time can't drop the whole chain
+                if not isinstance(mg_time, datetime) or mg_time.tzinfo is None:
+                    log_warning("[⚠️] Martingale time at level %d is not a timezone-aware datetime (%r); skipping.",
+                                level, mg_time)
+                    continue
+                entries.append((level, mg_time))
+            self._schedule_trades(entries, currency, direction, timeframe, expiry_seconds, group_id)
 
         except Exception as e:
-            logger.exception(f"[❌] handle_signal unexpected error: {e}")
-
-    # ---- schedule trade ----
-    def _schedule_trade(self, when, currency, direction, timeframe, group_id, martingale_level):
-        trade_id = f"{currency}_{when.strftime('%H%M%S')}_{martingale_level}_{uuid.uuid4().hex[:6]}"
-        thread = threading.Thread(target=self._trade_worker,
-                                  args=(trade_id, when, currency, direction, timeframe, group_id, martingale_level),
-                                  daemon=True)
-        thread.start()
-        logger.info(f"[🗓️] Scheduled trade id={trade_id} level={martingale_level} at {when.strftime('%H:%M:%S')} (group={group_id})")
+            logger.exception("[❌] handle_signal unexpected error: %s", e)
+            if group_id is not None:
+                # Nothing was scheduled, so no trade would ever release the group
+                with _groups_lock:
+                    grp = _active_groups.get(group_id)
+                    if grp is not None and grp["scheduled"] <= 0:
+                        _active_groups.pop(group_id, None)
+
+    def _is_duplicate_signal(self, key) -> bool:
+        # Listener retries and re-forwards otherwise schedule the same chain twice
+        now = time.monotonic()
+        seen = self._recent_signals.get(key)
+        if seen is not None and now - seen < SIGNAL_DEDUP_SECONDS:
+            return True
+        self._recent_signals[key] = now
+        self._recent_signals.move_to_end(key)
+        while len(self._recent_signals) > SIGNAL_DEDUP_MAX:
+            self._recent_signals.popitem(last=False)
+        return False
+
+    # ---- schedule trades ----
+    def _schedule_trades(self, entries, currency, direction, timeframe, expiry_seconds, group_id):
+        """Schedule (martingale_level, when) entries with one clock read, one counter update and one heap push."""
+        log_info = logger.info
+        verbose = logger.isEnabledFor(logging.INFO)
+        # Anchor entries on the monotonic clock once; wall-clock steps (NTP/DST) can't shift them afterwards
+        now_wall, now_mono = time.time(), time.monotonic()
+        batch = []
+        for martingale_level, when in entries:
+            trade_id = f"{currency}_{when.strftime('%H%M%S')}_{martingale_level}_{_short_id(3)}"
+            delay = when.timestamp() - now_wall  # both POSIX seconds; no tz-aware now() needed
+            batch.append((now_mono + delay, self._trade_worker,
+                          (trade_id, when, currency, direction, timeframe, expiry_seconds, group_id, martingale_level)))
+            if verbose:
+                log_info("[🗓️] Scheduled trade id=%s level=%d at %s (group=%s)",
+                         trade_id, martingale_level, when.strftime('%H:%M:%S'), group_id)
+                if delay > 0:
+                    log_info("[⏱️] Trade %s: waiting %.1fs until entry (level=%d)", trade_id, delay, martingale_level)
+        # Counted before any entry can fire, so an early finisher can't drop the group
+        with _groups_lock:
+            _active_groups[group_id]["scheduled"] += len(batch)
+        self._scheduler.call_at_many(batch, key=group_id, precise=True)
 
     # ---- worker ----
-    def _trade_worker(self, trade_id, when, currency, direction, timeframe, group_id, martingale_level):
+    def _trade_worker(self, trade_id, when, currency, direction, timeframe, expiry_seconds, group_id, martingale_level):
+        placed_at = None
         try:
-            now = datetime.now(when.tzinfo)
-            delay = (when - now).total_seconds()
-            if delay > 0:
-                logger.info(f"[⏱️] Trade {trade_id}: waiting {delay:.1f}s until entry (level={martingale_level})")
-                time.sleep(delay)
-        except Exception:
-            pass
-
-        with _registry_lock:
+            placed_at = self._register_trade(trade_id, currency, direction, timeframe, expiry_seconds, group_id, martingale_level)
+        finally:
+            # A live trade releases its group when its result (or timeout) settles, not here
+            if placed_at is None:
+                _release_group(group_id)
+        if placed_at is not None:
+            self._fire_trade(trade_id, when, direction, expiry_seconds, group_id, martingale_level, placed_at)
+
+    def _register_trade(self, trade_id, currency, direction, timeframe, expiry_seconds, group_id, martingale_level):
+        """Add the trade to the pending registry; returns placed_at, or None if the group is stopped."""
+        trade_info = PendingTrade(trade_id, currency, direction, timeframe, group_id, martingale_level)
+
+        # Check the group and register in one critical section; hotkeys are sent after release
+        with _groups_lock:
             grp = _active_groups.get(group_id)
-            if not grp or grp.get("stopped"):
-                logger.info(f"[⏹️] Trade {trade_id}: group stopped before entry; skipping.")
-                return
-
-        event = threading.Event()
-        placed_at = datetime.now(when.tzinfo)
-        trade_info = {
-            "id": trade_id,
-            "currency": currency,
-            "direction": direction,
-            "timeframe": timeframe,
-            "group_id": group_id,
-            "martingale_level": martingale_level,
-            "placed_at": placed_at,
-            "result": None,
-            "event": event
-        }
-
-        with _registry_lock:
-            _pending_trades[trade_id] = trade_info
-
-        logger.info(_random_log("firing_logs"))
+            stopped = not grp or grp["stopped"]
+            if not stopped:
+                with _pending_lock:
+                    # Stamped under the lock, so dict insertion order is placed_at order
+                    placed_at = trade_info.placed_at = time.time()
+                    _pending_trades[trade_id] = trade_info
+        if stopped:
+            logger.info("[⏹️] Trade %s: group stopped before entry; skipping.", trade_id)
+            return None
+        return placed_at
+
+    def _fire_trade(self, trade_id, when, direction, expiry_seconds, group_id, martingale_level, placed_at):
+        # Bound once per call; this runs for every trade entry
+        log_info, log_warning, log_error = logger.info, logger.warning, logger.error
+        _log_flavor("firing_logs")
 
         # send hotkey
         try:
-            if direction.upper() == "BUY":
-                pyautogui.hotkey("shift", "w")
-            else:
-                pyautogui.hotkey("shift", "s")
-            logger.info(f"[🎯] Trade {trade_id}: main-hotkey sent ({direction}) at {placed_at.strftime('%H:%M:%S')} level={martingale_level}")
+            _send_hotkey(*_ENTRY_CHORDS.get(direction, _SELL_CHORD))  # direction is upper-cased per signal
+            if logger.isEnabledFor(logging.INFO):
+                # The tz-aware datetime is only built for the log line
+                log_info("[🎯] Trade %s: main-hotkey sent (%s) at %s level=%d", trade_id, direction,
+                         datetime.fromtimestamp(placed_at, when.tzinfo).strftime('%H:%M:%S'), martingale_level)
         except Exception as e:
-            logger.error(f"[❌] Trade {trade_id}: failed main-hotkey: {e}")
+            log_error("[❌] Trade %s: failed main-hotkey: %s", trade_id, e)
 
 
         # --- Integrate with win_loss.py ---
+        scan_post = 0
         try:
-            import win_loss
-            expiry_seconds = _tf_to_seconds(timeframe)
-            expiry_timestamp = time.time() + expiry_seconds
-            win_loss.start_trade_result_monitor(trade_id, expiry_timestamp)
-            logger.info(f"[🔗] Linked win_loss monitoring for trade {trade_id} (expires in {expiry_seconds}s)")
+            win_loss = _get_win_loss()
+            win_loss.start_trade_result_monitor(trade_id, time.monotonic() + expiry_seconds)
+            scan_post = win_loss.SCAN_DURATION_POST
+            log_info("[🔗] Linked win_loss monitoring for trade %s (expires in %ds)", trade_id, expiry_seconds)
         except Exception as e:
-            logger.warning(f"[⚠️] Failed to start win_loss monitor for {trade_id}: {e}")
+            log_warning("[⚠️] Failed to start win_loss monitor for %s: %s", trade_id, e)
+
+        # Backstop only: the monitor reports NO_RESULT itself when its window closes, so this must not
+        # fire while a slow final scan is still running. Nothing to cancel on a result: the callback
+        # finds the trade already settled and returns.
+        self._scheduler.call_at(time.monotonic() + expiry_seconds + scan_post + EXPIRY_BUFFER_SECONDS,
+                                self._on_result_timeout, trade_id)
 
     
-        # increase trade amount ONCE
+        # increase trade amount ONCE (queued on the scheduler; the worker is free as soon as this returns)
         if martingale_level <= self.max_martingale:
             inc_delay = random.randint(2, 40)
-            logger.info(f"[⌛] Trade {trade_id}: waiting {inc_delay}s before increase-hotkey (level={martingale_level})")
-            time.sleep(inc_delay)
-            try:
-                logger.info(_random_log("martingale_logs"))
-                pyautogui.hotkey("shift", "d")
-                logger.info(f"[📈] Trade {trade_id}: increase-hotkey sent (level={martingale_level})")
-            except Exception as e:
-                logger.error(f"[❌] Trade {trade_id}: failed increase-hotkey: {e}")
-
-        # wait for result
-        expiry_seconds = _tf_to_seconds(timeframe)
-        wait_timeout = expiry_seconds + 5
-        got_result = event.wait(timeout=wait_timeout)
-
-        if got_result:
-            with _registry_lock:
-                info = _pending_trades.get(trade_id)
-            result_text = info.get("result") if info else None
-            logger.info(f"[📣] Trade {trade_id}: result received -> {result_text}")
+            log_info("[⌛] Trade %s: waiting %ds before increase-hotkey (level=%d)", trade_id, inc_delay, martingale_level)
+            self._scheduler.call_at(time.monotonic() + inc_delay, self._press_increase, trade_id, martingale_level)
+
+    def _settle_trade(self, info: PendingTrade):
+        """Result handling for a trade already claimed off the pending registry."""
+        trade_id = info.id
+        group_id = info.group_id
+        try:
+            result_text = info.result
+            logger.info("[📣] Trade %s: result received -> %s", trade_id, result_text)
             if result_text and result_text.strip().upper().startswith("WIN"):
-                logger.info(_random_log("win_logs"))
-                logger.info(f"[✅] Trade {trade_id} WIN — stopping martingale chain for group {group_id}")
-                with _registry_lock:
-                    grp = _active_groups.get(group_id)
-                    if grp is not None:
-                        grp["stopped"] = True
-                    _pending_trades.pop(trade_id, None)
-                return
+                _log_flavor("win_logs")
+                logger.info("[✅] Trade %s WIN — stopping martingale chain for group %s", trade_id, group_id)
+                self._stop_chain(group_id)
             else:
-                logger.info(_random_log("loss_logs"))
-                logger.info(f"[↪️] Trade {trade_id} LOSS/OTHER — continuing to next martingale.")
-                with _registry_lock:
-                    _pending_trades.pop(trade_id, None)
-                return
-        else:
-            logger.warning(f"[❌] Trade {trade_id}: NO RESULT received within expiry. Stopping group {group_id}.")
-            logger.info(_random_log("loss_logs"))
-            with _registry_lock:
-                grp = _active_groups.get(group_id)
-                if grp:
-                    grp["stopped"] = True
-                _pending_trades.pop(trade_id, None)
-            return
+                _log_flavor("loss_logs")
+                logger.info("[↪️] Trade %s LOSS/OTHER — continuing to next martingale.", trade_id)
+        finally:
+            _release_group(group_id)
+
+    def _on_result_timeout(self, trade_id: str):
+        info = _pending_trades.pop(trade_id, None)
+        if info is None:
+            return  # result already arrived
+        group_id = info.group_id
+        try:
+            logger.warning("[❌] Trade %s: NO RESULT received within expiry. Stopping group %s.", trade_id, group_id)
+            _log_flavor("loss_logs")
+            self._stop_chain(group_id)
+        finally:
+            _release_group(group_id)
+
+    def _stop_chain(self, group_id: str):
+        # Stop first: an entry the scheduler pops meanwhile sees the flag and releases itself
+        _stop_group(group_id)
+        cancelled = self._scheduler.cancel(group_id)
+        if cancelled:
+            logger.info("[⏹️] Cancelled %d queued martingale trade(s) for group %s", cancelled, group_id)
+            _release_group(group_id, cancelled)
+
+    def _press_increase(self, trade_id, martingale_level):
+        try:
+            _log_flavor("martingale_logs")
+            _send_hotkey(*_INCREASE_CHORD)
+            logger.info("[📈] Trade %s: increase-hotkey sent (level=%d)", trade_id, martingale_level)
+        except Exception as e:
+            logger.error("[❌] Trade %s: failed increase-hotkey: %s", trade_id, e)
 
     # ---- result API ----
     def _set_result_for_id(self, trade_id: str, result_text: str):
-        with _registry_lock:
-            info = _pending_trades.get(trade_id)
-            if not info:
-                logger.info(f"[ℹ️] Received result for unknown trade_id={trade_id}: {result_text}")
-                return False
-            info["result"] = result_text
-            info["event"].set()
-            return True
+        # Popping claims the trade, so a late timeout (or duplicate report) can't settle it twice
+        info = _pending_trades.pop(trade_id, None)
+        if not info:
+            logger.info("[ℹ️] Received result for unknown trade_id=%s: %s", trade_id, result_text)
+            return False
+        info.result = result_text
+        self._scheduler.submit(self._settle_trade, info)
+        return True
 
     def trade_result_received(self, trade_id: Optional[str], result_text: str):
         try:
             rt = (result_text or "").strip()
-            logger.info(f"[🛰️] trade_result_received called -> {trade_id=} {rt}")
+            logger.info("[🛰️] trade_result_received called -> trade_id=%r %s", trade_id, rt)
             if trade_id:
-                ok = self._set_result_for_id(trade_id, rt)
-                if ok:
-                    return
-            with _registry_lock:
+                # An unknown id was already settled (or never placed); never hand it to another trade
+                self._set_result_for_id(trade_id, rt)
+                return
+            with _pending_lock:
                 if not _pending_trades:
                     return
-                latest_id = max(_pending_trades, key=lambda k: _pending_trades[k]["placed_at"])
+                latest_id = next(reversed(_pending_trades))  # newest placed_at is the last inserted
             self._set_result_for_id(latest_id, rt)
         except Exception as e:
-            logger.exception(f"[❌] trade_result_received error: {e}")
+            logger.exception("[❌] trade_result_received error: %s", e)
 
     def handle_trade_result(self, status: str, amount: Optional[float] = None, trade_id: Optional[str] = None):
         try:
@@ -288,50 +619,74 @@ class TradeManager:
                 txt = f"{status} {amount:+g}"
             self.trade_result_received(trade_id, txt)
         except Exception as e:
-            logger.exception(f"[❌] handle_trade_result error: {e}")
+            logger.exception("[❌] handle_trade_result error: %s", e)
 
     # ---- handle Telegram /start and /stop ----
+    def _cmd_start(self):
+        logger.info("[✅] Trading started (command received)")
+        # Optional: self.enabled = True
+
+    def _cmd_stop(self):
+        logger.info("[🛑] Trading stopped (command received)")
+        # Optional: self.enabled = False
+
+    _COMMANDS = {
+        "/start": _cmd_start,
+        "/stop": _cmd_stop,
+    }
+
     def handle_command(self, cmd: str):
         """
         Handles commands like /start and /stop without breaking the core logic.
         """
         try:
-            if cmd.startswith("/start"):
-                logger.info("[✅] Trading started (command received)")
-                # Optional: self.enabled = True
-            elif cmd.startswith("/stop"):
-                logger.info("[🛑] Trading stopped (command received)")
-                # Optional: self.enabled = False
-            else:
-                logger.info(f"[ℹ️] Unknown command received: {cmd}")
+            # "/start", "/start@SomeBot" and "/start now" all dispatch on "/start"
+            parts = cmd.split(maxsplit=1)
+            key = parts[0].split("@", 1)[0].lower() if parts else ""
+            handler = self._COMMANDS.get(key)
+            if handler is None:
+                logger.info("[ℹ️] Unknown command received: %s", cmd)
+                return
+            handler(self)
         except Exception as e:
-            logger.exception(f"[❌] handle_command error: {e}")
+            logger.exception("[❌] handle_command error: %s", e)
 
 # ---------------------------
 # Create singleton in shared
 # ---------------------------
-shared.trade_manager = TradeManager(max_martingale=3)
+# Guarded so a second import of this module (e.g. `core` alongside `__main__`) reuses the live manager
+if shared.trade_manager is None:
+    shared.trade_manager = TradeManager(max_martingale=3)
 
 # ---------------------------
 # Public API
 # ---------------------------
+# The singleton is fixed for the life of the process; bind its entrypoints once
+_handle_signal = shared.trade_manager.handle_signal
+_result_received = shared.trade_manager.trade_result_received
+_handle_result = shared.trade_manager.handle_trade_result
+
 def signal_callback(signal: dict):
-    shared.trade_manager.handle_signal(signal)
+    _handle_signal(signal)
 
 def trade_result_received(trade_id: Optional[str], result_text: str):
-    shared.trade_manager.trade_result_received(trade_id, result_text)
+    _result_received(trade_id, result_text)
 
 def handle_trade_result(status: str, amount: Optional[float] = None, trade_id: Optional[str] = None):
-    shared.trade_manager.handle_trade_result(status, amount, trade_id)
+    _handle_result(status, amount, trade_id)
 
 # ---------------------------
 # Keep alive
 # ---------------------------
 if __name__ == "__main__":
     logger.info("[🚀] Core started (hotkey mode). Waiting for signals...")
+    _shutdown = threading.Event()
     try:
-        while True:
-            time.sleep(30)
-            logger.info(_random_log("idle_logs"))
+        if logger.isEnabledFor(logging.INFO):
+            # The 30s wake-up only exists for the idle personality line
+            while not _shutdown.wait(30):
+                _log_flavor("idle_logs")
+        else:
+            _shutdown.wait()
     except KeyboardInterrupt:
         logger.info("[🛑] Core stopped by KeyboardInterrupt")
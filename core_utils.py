@@ -2,13 +2,58 @@
 core_utils.py — Timezone conversion and logging helpers
 """
 
-from datetime import datetime, timedelta
-import pytz
+from datetime import datetime, time as dt_time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+import json
 import logging
 import random
+import re
 
 logger = logging.getLogger(__name__)
 
+# --------------------------
+# Resolve a sender timezone string to a tzinfo
+# Cached: signals reuse a handful of sources (UTC-4, OTC-3, Cameroon),
+# and every martingale time resolves the same one again.
+# --------------------------
+# Every real-world offset (quarter hours, ±14h) built once; "UTC-3" and "OTC-3" share one tzinfo
+_FIXED_OFFSETS = {m: timezone(timedelta(minutes=m)) for m in range(-14 * 60, 14 * 60 + 1, 15)}
+_FIXED_OFFSETS[0] = timezone.utc
+_TZ_OFFSET_RE = re.compile(r'^(utc|otc)\s*(?:([+-]?)\s*(\d{1,2}))?$')
+
+@lru_cache(maxsize=128)
+def _resolve_tz(source_tz_str):
+    tz_lower = source_tz_str.lower().strip()
+    # "UTC-4", "UTC+1", "OTC-3" (OTC-3 -> UTC-3), bare "UTC": one match, sign taken from the string
+    m = _TZ_OFFSET_RE.match(tz_lower)
+    if m:
+        _, sign_ch, hours = m.groups()
+        if not hours:
+            return timezone.utc
+        minutes = (-1 if sign_ch == "-" else 1) * int(hours) * 60
+        tz = _FIXED_OFFSETS.get(minutes)
+        return tz if tz is not None else timezone(timedelta(minutes=minutes))
+    if tz_lower.startswith(("utc", "otc")):
+        logger.warning("[⚠️] Could not parse UTC/OTC offset from '%s', defaulting UTC", source_tz_str)
+        return timezone.utc
+    if tz_lower == "cameroon":
+        return ZoneInfo("Africa/Douala")  # UTC+1
+    try:
+        return ZoneInfo(source_tz_str)
+    except Exception:
+        logger.warning("[⚠️] Unrecognized timezone '%s', defaulting UTC", source_tz_str)
+        return timezone.utc
+
+# --------------------------
+# "HH:MM" -> time; signals only ever carry this fixed shape
+# --------------------------
+@lru_cache(maxsize=1440)  # one slot per minute of the day: never evicts
+def _parse_hhmm(value):
+    if len(value) == 5 and value[2] == ":":
+        return dt_time(int(value[:2]), int(value[3:]))
+    return datetime.strptime(value, "%H:%M").time()  # odd shapes ("9:05") keep strptime's rules
+
 # --------------------------
 # Convert sender timezone to UTC or signal's tz for scheduling
 # Handles:
@@ -16,69 +61,90 @@ logger = logging.getLogger(__name__)
 # - datetime.datetime (naive or tz-aware)
 # - Cameroon, UTC offsets, OTC-X
 # --------------------------
-def timezone_convert(entry_time_val, source_tz_str):
+def timezone_convert(entry_time_val, source_tz_str, now_utc=None):
     """
     Converts entry_time_val from sender timezone to a timezone-aware datetime.
     Returns datetime in signal's timezone or None if the signal has already passed.
     Accepts:
     - entry_time_val: str ("HH:MM") or datetime.datetime
     - source_tz_str: timezone string like "Cameroon", "UTC-4", "OTC-3"
+    - now_utc: optional tz-aware "now" (any zone; normalized to UTC), so a signal's entry and
+      martingale times share one clock read
     """
     try:
-        tz_lower = source_tz_str.lower().strip()
-        # Determine source timezone
-        if tz_lower.startswith("utc"):
-            sign = 1 if "+" in tz_lower else -1
-            try:
-                hours = int(tz_lower.split("utc")[1].replace("+", "").replace("-", ""))
-                src_tz = pytz.FixedOffset(sign * hours * 60)
-            except Exception:
-                src_tz = pytz.UTC
-                logger.warning(f"[⚠️] Could not parse UTC offset from '{source_tz_str}', defaulting UTC")
-        elif tz_lower == "cameroon":
-            src_tz = pytz.timezone("Africa/Douala")  # UTC+1
-        elif tz_lower.startswith("otc-"):
-            try:
-                offset_hours = int(tz_lower.split("-")[1])
-                src_tz = pytz.FixedOffset(-offset_hours * 60)  # OTC-3 -> UTC-3
-            except Exception:
-                src_tz = pytz.UTC
-                logger.warning(f"[⚠️] Could not parse OTC offset from '{source_tz_str}', defaulting UTC")
-        else:
-            try:
-                src_tz = pytz.timezone(source_tz_str)
-            except Exception:
-                src_tz = pytz.UTC
-                logger.warning(f"[⚠️] Unrecognized timezone '{source_tz_str}', defaulting UTC")
-
-        now_src = datetime.now(pytz.utc).astimezone(src_tz)
+        src_tz = _resolve_tz(source_tz_str)
+        if now_utc is None:
+            now_utc = datetime.now(timezone.utc)
+        elif now_utc.tzinfo is not timezone.utc:
+            now_utc = now_utc.astimezone(timezone.utc)  # the fixed-offset date math below assumes UTC
 
         # Handle datetime input
         if isinstance(entry_time_val, datetime):
             if entry_time_val.tzinfo is None:
-                entry_dt = src_tz.localize(entry_time_val)
+                entry_dt = entry_time_val.replace(tzinfo=src_tz)
+            elif entry_time_val.tzinfo is src_tz:
+                entry_dt = entry_time_val  # already in the signal's zone
             else:
                 entry_dt = entry_time_val.astimezone(src_tz)
         # Handle string input
         elif isinstance(entry_time_val, str):
-            fmt = "%H:%M"
-            entry_time = datetime.strptime(entry_time_val, fmt).time()
-            entry_dt = datetime.combine(now_src.date(), entry_time)
-            entry_dt = src_tz.localize(entry_dt) if entry_dt.tzinfo is None else entry_dt
+            entry_time = _parse_hhmm(entry_time_val)
+            # Only the "today" of a bare HH:MM needs now in the source zone; a UTC signal already has it
+            if now_utc.tzinfo is src_tz:
+                today = now_utc.date()
+            elif type(src_tz) is timezone:
+                today = (now_utc + src_tz.utcoffset(None)).date()  # fixed offset: plain arithmetic
+            else:
+                today = now_utc.astimezone(src_tz).date()
+            entry_dt = datetime.combine(today, entry_time, tzinfo=src_tz)  # _parse_hhmm times are naive
         else:
-            logger.warning(f"[⚠️] Invalid entry_time type: {type(entry_time_val)}")
+            logger.warning("[⚠️] Invalid entry_time type: %s", type(entry_time_val))
             return None
 
-        # Ignore past signals
-        if entry_dt < now_src:
+        # Ignore past signals (aware datetimes compare on the UTC instant; no conversion needed)
+        if entry_dt < now_utc:
             return None
 
         return entry_dt
 
     except Exception as e:
-        logger.warning(f"[⚠️] Failed timezone conversion for '{entry_time_val}' ({source_tz_str}): {e}")
+        logger.warning("[⚠️] Failed timezone conversion for '%s' (%s): %s", entry_time_val, source_tz_str, e)
         return None
 
+# --------------------------
+# Personality log buckets (logs.json)
+# Read once per process, on the first line actually emitted; shared by every module
+# --------------------------
+_DEFAULT_LOG_BUCKETS = {
+    "idle_logs": ["Precision is idling."],
+    "pre_trade_logs": ["Precision preparing trade."],
+    "firing_logs": ["Precision firing."],
+    "martingale_logs": ["Martingale engaged."],
+    "win_logs": ["Win!"],
+    "loss_logs": ["Loss."],
+    "praise_desmond": ["Desmond is great."],
+    "roast_others": ["Look at others."],
+    "questions": ["What's next?"]
+}
+LOG_BUCKETS = None
+
+def load_log_buckets():
+    global LOG_BUCKETS
+    try:
+        with open("logs.json", "r", encoding="utf-8") as f:
+            buckets = json.load(f)
+    except Exception as e:
+        logger.warning("[⚠️] Failed to load logs.json: %s. Using minimal defaults.", e)
+        buckets = _DEFAULT_LOG_BUCKETS
+    # Buckets never change after load; tuples are compact and index directly for random.choice
+    LOG_BUCKETS = {k: tuple(v) for k, v in buckets.items() if isinstance(v, (list, tuple))}
+    return LOG_BUCKETS
+
+def random_log(category, _choice=random.choice):
+    buckets = LOG_BUCKETS if LOG_BUCKETS is not None else load_log_buckets()
+    bucket = buckets.get(category)
+    return _choice(bucket) if bucket else ""
+
 # --------------------------
 # Random interactive log message
 # --------------------------
@@ -9,8 +9,12 @@ except Exception:
     print("[❌] Exception during initialization:")
     traceback.print_exc()
 
-# Keep container alive to inspect logs
-import time
-while True:
-    time.sleep(1)
+# Keep container alive to inspect logs (sleep until a signal arrives instead of waking every second)
+import signal
+import threading
+if hasattr(signal, "pause"):
+    while True:
+        signal.pause()
+else:
+    threading.Event().wait()
   
@@ -1,6 +1,7 @@
 # launcher.py
 import os
 import time
+import threading
 import tempfile
 import pyperclip
 from selenium import webdriver
@@ -114,8 +115,7 @@ except Exception as e:
 # -----------------------------
 print("[ℹ️] Browser will remain open. Press Ctrl+C to exit.")
 try:
-    while True:
-        time.sleep(30)
+    threading.Event().wait()  # park until Ctrl+C; no periodic wake-ups
 except KeyboardInterrupt:
     driver.quit()
     print("[🛑] Chrome closed by KeyboardInterrupt.")
@@ -34,9 +34,9 @@ def telegram_signal_callback(signal: dict, max_wait_sec: int = 10):
 
     try:
         shared.trade_manager.handle_signal(signal)
-        logger.info(f"[🤖] Signal forwarded to TradeManager: {signal.get('currency_pair')} at {signal.get('entry_time')}")
+        logger.info("[🤖] Signal forwarded to TradeManager: %s at %s", signal.get('currency_pair'), signal.get('entry_time'))
     except Exception as e:
-        logger.error(f"[❌] Failed to process signal: {e}")
+        logger.error("[❌] Failed to process signal: %s", e)
 
 
 # --------------------------
@@ -58,9 +58,9 @@ def telegram_command_callback(cmd: str, max_wait_sec: int = 10):
 
     try:
         shared.trade_manager.handle_command(cmd)
-        logger.info(f"[🤖] Command processed: {cmd}")
+        logger.info("[🤖] Command processed: %s", cmd)
     except Exception as e:
-        logger.error(f"[❌] Failed to process command: {e}")
+        logger.error("[❌] Failed to process command: %s", e)
 
 
 # --------------------------
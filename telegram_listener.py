@@ -7,10 +7,11 @@ Filename: Telegram listener..py
 """
 
 from telethon import TelegramClient, events
+import asyncio
 import re
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 import logging
-import traceback
 
 # Hard-coded credentials (keep as before)
 api_id = 29630724
@@ -26,16 +27,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger("telegram_listener")
 
-def log_info(msg):
-    logger.info(msg)
+def log_info(msg, *args):
+    logger.info(msg, *args)
     for h in logger.handlers:
         try:
             h.flush()
         except Exception:
             pass
 
-def log_error(msg):
-    logger.error(msg)
+def log_error(msg, *args):
+    logger.error(msg, *args)
+    for h in logger.handlers:
+        try:
+            h.flush()
+        except Exception:
+            pass
+
+def log_exception(msg, *args):
+    # logger.exception attaches the active traceback; it is only formatted if the record is emitted
+    logger.exception(msg, *args)
     for h in logger.handlers:
         try:
             h.flush()
@@ -47,7 +57,7 @@ try:
     import core
     import shared
 except Exception as e:
-    log_error(f"[❌] Failed to import core/shared: {e}")
+    log_error("[❌] Failed to import core/shared: %s", e)
     raise
 
 # Try to import timezone_convert from core_utils if available
@@ -60,6 +70,18 @@ except Exception:
 # ---------------------------
 # Signal parsing (full logic from your previous code)
 # ---------------------------
+# Compiled once at import; every channel message goes through these
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7F]+')
+_PAIR_RE = re.compile(r'([A-Z]{3}/[A-Z]{3})(?:[\s_\-]?OTC)?', re.IGNORECASE)
+_DIRECTION_RE = re.compile(r'(?P<buy>BUY|CALL|🟩|🔼)|(?P<sell>SELL|PUT|🟥|🔽)', re.IGNORECASE)
+_ENTRY_TIME_RE = re.compile(r'(?:Entry Time:|Entry at|TIME \(UTC.*\):|⏺ Entry at|Entry:)\s*(\d{2}:\d{2})', re.IGNORECASE)
+_TIMEFRAME_RE = re.compile(r'Expiration:?\s*(M1|M5|1 Minute|5 Minute|5M|1M|5-minute)', re.IGNORECASE)
+_ANNA_MG_STEP = timedelta(minutes=1)
+_MARTINGALE_RE = re.compile(
+    r'(?:Level \d+|level(?: at)?|PROTECTION|level At|level|ª PROTECTION)\D*[:\-\—>]*\s*(\d{2}:\d{2})',
+    re.IGNORECASE
+)
+
 def parse_signal(message_text: str):
     """
     Parses the message_text for various signal formats (Anna, OTC, Precision).
@@ -78,27 +100,22 @@ def parse_signal(message_text: str):
             "source": "OTC-3"
         }
 
-        # quick filter
-        if not re.search(r'(BUY|SELL|CALL|PUT|🔼|🟥|🟩|🔽|✅ ANNA SIGNALS ✅|_OTC)', message_text, re.IGNORECASE):
+        # Direction doubles as the quick filter: a message without one can never be a valid signal.
+        # One scan; the named group says which side matched first ("⏺ BUY" is caught by BUY)
+        direction_match = _DIRECTION_RE.search(message_text)
+        if not direction_match:
             return None
+        result['direction'] = 'BUY' if direction_match.group('buy') else 'SELL'
 
         is_anna_signal = "anna signals" in message_text.lower()
-        clean_text = re.sub(r'[^\x00-\x7F]+', ' ', message_text)  # remove non-ascii emojis for some regexes
+        now_utc = datetime.now(timezone.utc)  # one clock read for the entry and every martingale time
+        clean_text = _NON_ASCII_RE.sub(' ', message_text)  # remove non-ascii emojis for some regexes
 
         # Currency Pair
-        pair_match = re.search(r'([A-Z]{3}/[A-Z]{3})(?:[\s_\-]?OTC)?', clean_text, re.IGNORECASE)
+        pair_match = _PAIR_RE.search(clean_text)
         if pair_match:
             result['currency_pair'] = pair_match.group(1).strip().upper()
 
-        # Direction
-        direction_match = re.search(r'(BUY|SELL|CALL|PUT|🔼|🟥|🟩|🔽|⏺ BUY|⏺ SELL)', message_text, re.IGNORECASE)
-        if direction_match:
-            direction = direction_match.group(1).upper()
-            if direction in ['CALL', 'BUY', '🟩', '🔼', '⏺ BUY']:
-                result['direction'] = 'BUY'
-            elif direction in ['PUT', 'SELL', '🔽', '🟥', '⏺ SELL']:
-                result['direction'] = 'SELL'
-
         # Source detection (keeps your mapping)
         source = "OTC-3"
         if "💥 GET THIS SIGNAL HERE!" in message_text:
@@ -108,38 +125,29 @@ def parse_signal(message_text: str):
         result['source'] = source
 
         # Entry Time (various labels)
-        entry_time_match = re.search(
-            r'(?:Entry Time:|Entry at|TIME \(UTC.*\):|⏺ Entry at|Entry:)\s*(\d{2}:\d{2})',
-            message_text, re.IGNORECASE
-        )
+        entry_time_match = _ENTRY_TIME_RE.search(message_text)
         if entry_time_match:
             entry_time_str = entry_time_match.group(1)
             # Prefer using timezone_convert if available
             if timezone_convert:
-                converted = timezone_convert(entry_time_str, source)
+                converted = timezone_convert(entry_time_str, source, now_utc)
                 if not converted:
-                    log_info(f"[⚠️] Signal entry time {entry_time_str} appears to already have passed or is invalid; skipping.")
+                    log_info("[⚠️] Signal entry time %s appears to already have passed or is invalid; skipping.", entry_time_str)
                     return None
                 result['entry_time'] = converted
             else:
                 # naive fallback: create a datetime in UTC by parsing HH:MM as UTC today
                 try:
                     hh, mm = map(int, entry_time_str.split(":"))
-                    now = datetime.utcnow()
-                    entry_dt = now.replace(hour=hh, minute=mm, second=0, microsecond=0)
-                    # attach UTC tzinfo so downstream expects tz-aware whenever timezone_convert used
-                    try:
-                        import pytz
-                        entry_dt = pytz.UTC.localize(entry_dt)
-                    except Exception:
-                        pass
+                    # tz-aware UTC so downstream sees the same shape as timezone_convert output
+                    entry_dt = now_utc.replace(hour=hh, minute=mm, second=0, microsecond=0)
                     result['entry_time'] = entry_dt
                 except Exception:
-                    log_error(f"[❌] Failed naïve parse of entry_time '{entry_time_str}'")
+                    log_error("[❌] Failed naïve parse of entry_time '%s'", entry_time_str)
                     return None
 
         # Timeframe
-        timeframe_match = re.search(r'Expiration:?\s*(M1|M5|1 Minute|5 Minute|5M|1M|5-minute)', message_text, re.IGNORECASE)
+        timeframe_match = _TIMEFRAME_RE.search(message_text)
         if timeframe_match:
             tf = timeframe_match.group(1).lower()
             result['timeframe'] = 'M1' if '1' in tf else 'M5'
@@ -147,39 +155,30 @@ def parse_signal(message_text: str):
             result['timeframe'] = 'M1' if is_anna_signal else 'M5'
 
         # Martingale times extraction (many formats)
-        martingale_matches = re.findall(
-            r'(?:Level \d+|level(?: at)?|PROTECTION|level At|level|ª PROTECTION)\D*[:\-\—>]*\s*(\d{2}:\d{2})',
-            message_text, re.IGNORECASE
-        )
+        martingale_matches = _MARTINGALE_RE.findall(message_text)
         mg_times = []
         for t in martingale_matches:
             if timezone_convert and result.get('source'):
-                converted = timezone_convert(t, result['source'])
+                converted = timezone_convert(t, result['source'], now_utc)
                 if converted:
                     mg_times.append(converted)
             else:
                 # naive fallback (UTC)
                 try:
                     hh, mm = map(int, t.split(":"))
-                    now = datetime.utcnow()
-                    mg_dt = now.replace(hour=hh, minute=mm, second=0, microsecond=0)
-                    try:
-                        import pytz
-                        mg_dt = pytz.UTC.localize(mg_dt)
-                    except Exception:
-                        pass
+                    mg_dt = now_utc.replace(hour=hh, minute=mm, second=0, microsecond=0)
                     mg_times.append(mg_dt)
                 except Exception:
-                    log_error(f"[⚠️] Failed naive parse of martingale time '{t}'")
+                    log_error("[⚠️] Failed naive parse of martingale time '%s'", t)
         result['martingale_times'] = mg_times
 
         # If Anna signals and no martingale times found, create defaults (+1m, +2m)
         if is_anna_signal and not result['martingale_times'] and result['entry_time']:
-            interval = timedelta(minutes=1)
-            first_mg = result['entry_time'] + interval
-            second_mg = first_mg + interval
+            first_mg = result['entry_time'] + _ANNA_MG_STEP
+            second_mg = first_mg + _ANNA_MG_STEP
             result['martingale_times'] = [first_mg, second_mg]
-            log_info(f"[🔁] Default Anna martingale times applied: {[t.strftime('%H:%M') for t in result['martingale_times']]}")
+            if logger.isEnabledFor(logging.INFO):
+                log_info("[🔁] Default Anna martingale times applied: %s", [t.strftime('%H:%M') for t in result['martingale_times']])
 
         # Final sanity check
         if not result['currency_pair'] or not result['direction'] or not result['entry_time']:
@@ -188,70 +187,78 @@ def parse_signal(message_text: str):
         return result
 
     except Exception as e:
-        tb = traceback.format_exc()
-        log_error(f"[❌] Error parsing signal: {e}\n{tb}")
+        log_exception("[❌] Error parsing signal: %s", e)
         return None
 
 # ---------------------------
 # Telegram listener and forwarding
 # ---------------------------
+# TradeManager calls block (screen_logic, locks); run them off the Telethon event loop.
+# A single worker keeps signals and commands in arrival order.
+_forward_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tg-forward")
+
+_COMMAND_RE = re.compile(r'^/(start|stop)')
+
+def _looks_like_signal(text):
+    # Telethon's pattern= only match()es at the start; signals need a search
+    if not text or _COMMAND_RE.match(text):
+        return None
+    return _DIRECTION_RE.search(text)  # parse_signal rejects anything without a direction
+
+async def _run_blocking(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_forward_executor, fn, *args)
+
 def start_telegram_listener():
     log_info("[🔌] Starting Telegram listener (integrated) ...")
     client = TelegramClient('bot_session', api_id, api_hash)
 
-    @client.on(events.NewMessage(chats=TARGET_CHAT_ID))
-    async def handler(event):
+    # Telethon applies the pattern before dispatch, so chatter that is neither a
+    # command nor signal-shaped never reaches a Python handler
+    @client.on(events.NewMessage(chats=TARGET_CHAT_ID, pattern=_COMMAND_RE))
+    async def command_handler(event):
         try:
             text = event.message.message or ""
-            # Commands
-            if text.startswith("/start") or text.startswith("/stop"):
-                log_info(f"[💻] Command detected: {text}")
-                # Forward command to TradeManager if present
-                try:
-                    # prefer core-level API if available, otherwise shared.trade_manager
-                    if hasattr(core, "handle_command"):
-                        # core.py doesn't define handle_command wrapper; use shared.trade_manager
-                        pass
-                except Exception:
-                    pass
-
-                # Use shared.trade_manager.handle_command when available
-                try:
-                    if shared.trade_manager is not None:
-                        shared.trade_manager.handle_command(text)
-                        log_info(f"[✅] Command forwarded to TradeManager: {text}")
-                    else:
-                        log_error("[⚠️] TradeManager not ready; command ignored.")
-                except Exception as e:
-                    log_error(f"[❌] Failed to forward command: {e}")
-                return
+            log_info("[💻] Command detected: %s", text)
+            # Use shared.trade_manager.handle_command when available
+            try:
+                if shared.trade_manager is not None:
+                    await _run_blocking(shared.trade_manager.handle_command, text)
+                    log_info("[✅] Command forwarded to TradeManager: %s", text)
+                else:
+                    log_error("[⚠️] TradeManager not ready; command ignored.")
+            except Exception as e:
+                log_error("[❌] Failed to forward command: %s", e)
+        except Exception as e:
+            log_exception("[❌] Error handling message: %s", e)
 
-            # Signals
-            parsed = parse_signal(text)
+    @client.on(events.NewMessage(chats=TARGET_CHAT_ID, pattern=_looks_like_signal))
+    async def signal_handler(event):
+        try:
+            parsed = parse_signal(event.message.message or "")
             if parsed:
                 recv_time = datetime.utcnow().strftime("%H:%M:%S")
-                log_info(f"[⚡] Parsed signal at {recv_time}: {parsed}")
+                log_info("[⚡] Parsed signal at %s: %s", recv_time, parsed)  # dict repr (datetimes) only built if emitted
 
                 # Forward to core.signal_callback if exists (core provides signal_callback wrapper)
                 try:
                     if hasattr(core, "signal_callback"):
-                        core.signal_callback(parsed)
+                        await _run_blocking(core.signal_callback, parsed)
                         log_info("[🤖] Sent to core.signal_callback")
                     else:
                         # last-resort: shared.trade_manager
                         if shared.trade_manager is not None:
-                            shared.trade_manager.handle_signal(parsed)
+                            await _run_blocking(shared.trade_manager.handle_signal, parsed)
                             log_info("[🤖] Sent to shared.trade_manager.handle_signal")
                         else:
                             log_error("[⚠️] TradeManager not ready; signal queued or ignored (no queue active).")
                 except Exception as e:
-                    log_error(f"[❌] Error forwarding signal to core: {e}")
-                    log_error(traceback.format_exc())
+                    log_exception("[❌] Error forwarding signal to core: %s", e)
             else:
                 log_info("[ℹ️] Message ignored (not a valid signal).")
 
         except Exception as e:
-            log_error(f"[❌] Error handling message: {e}\n{traceback.format_exc()}")
+            log_exception("[❌] Error handling message: %s", e)
 
     try:
         log_info("[⚙️] Connecting to Telegram...")
@@ -259,7 +266,7 @@ def start_telegram_listener():
         log_info("[✅] Connected to Telegram. Listening for messages...")
         client.run_until_disconnected()
     except Exception as e:
-        log_error(f"[❌] Telegram listener failed: {e}\n{traceback.format_exc()}")
+        log_exception("[❌] Telegram listener failed: %s", e)
 
 # ---------------------------
 # Entry point
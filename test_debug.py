@@ -1,7 +1,7 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
-import pytz
+from zoneinfo import ZoneInfo
 
 from core import trade_manager, signal_callback
 
@@ -12,7 +12,7 @@ logger = logging.getLogger(__name__)
 
 async def main():
     # Construct a dummy signal to test your existing code.
-    tz = pytz.timezone("Africa/Douala")
+    tz = ZoneInfo("Africa/Douala")
     now = datetime.now(tz)
     signal = {
         "currency_pair": "AUD/CHF",
@@ -1,3 +1,5 @@
+import heapq
+import itertools
 import threading
 import time
 import cv2
@@ -51,6 +53,27 @@ def _load_templates_from_dir(directory: str):
         logger.debug(f"[📂] Loaded {len(templates)} templates from {directory}")
     return templates
 
+_template_cache = {}  # directory -> (directory mtime, templates)
+_template_cache_lock = threading.Lock()
+
+def _get_templates(directory: str):
+    """
+    Returns the decoded templates for a directory, re-reading the PNGs only when
+    the directory changed (a template was saved or cleaned up).
+    """
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except OSError:
+        return []
+    with _template_cache_lock:
+        cached = _template_cache.get(directory)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    templates = _load_templates_from_dir(directory)
+    with _template_cache_lock:
+        _template_cache[directory] = (mtime, templates)
+    return templates
+
 def _cleanup_templates(template_dir):
     files = sorted(glob.glob(os.path.join(template_dir, "*.png")), key=os.path.getmtime)
     while len(files) > MAX_TEMPLATES:
@@ -95,15 +118,37 @@ def _capture_template_from_roi(roi, result_type):
             _save_template_if_needed(roi, LOSS_TEMPLATE_DIR, "loss")
             break
 
+# ---------------------------
+# Screen capture session
+# ---------------------------
+_capture = threading.local()
+
+def _grab_fullscreen():
+    """
+    Grabs the full screen through a long-lived mss session.
+    mss handles are bound to the thread that opened them, so one session is kept
+    per monitor thread; a failed grab drops it and the next call reconnects.
+    """
+    sct = getattr(_capture, "sct", None)
+    if sct is None:
+        sct = _capture.sct = mss.mss()
+    try:
+        return sct.grab(sct.monitors[0])  # Full screen
+    except Exception:
+        _capture.sct = None
+        try:
+            sct.close()
+        except Exception:
+            pass
+        raise
+
 # ---------------------------
 # Win/Loss Detection (Full-Screen)
 # ---------------------------
 def _cv_detect_result(trade_id=None) -> str:
     try:
-        with mss.mss() as sct:
-            monitor = sct.monitors[0]  # Full screen
-            sct_img = sct.grab(monitor)
-            screenshot = np.array(sct_img)[:, :, :3]  # RGB
+        sct_img = _grab_fullscreen()
+        screenshot = np.array(sct_img)[:, :, :3]  # RGB
 
         timestamp = datetime.datetime.now().strftime("%H%M%S_%f")
 
@@ -113,8 +158,8 @@ def _cv_detect_result(trade_id=None) -> str:
             Image.fromarray(screenshot).save(debug_path)
             logger.debug(f"[💾] Saved full screenshot: {debug_path}")
 
-        win_templates = _load_templates_from_dir(WIN_TEMPLATE_DIR)
-        loss_templates = _load_templates_from_dir(LOSS_TEMPLATE_DIR)
+        win_templates = _get_templates(WIN_TEMPLATE_DIR)
+        loss_templates = _get_templates(LOSS_TEMPLATE_DIR)
 
         # ---------------- Dynamic sliding window detection ----------------
         WINDOW_SIZE = (150, 50)  # width, height of sliding window
@@ -130,7 +175,7 @@ def _cv_detect_result(trade_id=None) -> str:
                         res = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
                         max_val = np.max(res)
                         if DEBUG_MODE:
-                            logger.debug(f"[🧩] {type_name} template[{i}] window match score: {max_val:.3f} at ({x},{y})")
+                            logger.debug("[🧩] %s template[%d] window match score: %.3f at (%d,%d)", type_name, i, max_val, x, y)
                         if max_val >= TEMPLATE_MATCH_THRESHOLD:
                             return True, (x, y, template.shape[1], template.shape[0])
             return False, None
@@ -142,14 +187,14 @@ def _cv_detect_result(trade_id=None) -> str:
         gray_full = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
         ocr_text_full = pytesseract.image_to_string(gray_full)
         if DEBUG_MODE:
-            logger.debug(f"[🔡] Full-screen OCR text: {ocr_text_full.strip()!r}")
+            logger.debug("[🔡] Full-screen OCR text: %r", ocr_text_full.strip())
 
         # ---------------- Balance/Timeframe capture ----------------
         # Pocket Option does not show "$" reliably, so we just log detected numeric values or timeframe
         balance_candidates = [s for s in ocr_text_full.split() if any(c.isdigit() for c in s)]
         balance_detected = balance_candidates[0] if balance_candidates else None
         if balance_detected:
-            logger.info(f"[💰] Detected balance/timeframe (approx): {balance_detected}")
+            logger.info("[💰] Detected balance/timeframe (approx): %s", balance_detected)
 
         # ---------------- Capture dynamic ROI for template learning ----------------
         def capture_template_from_pos(pos, result_type):
@@ -163,59 +208,112 @@ def _cv_detect_result(trade_id=None) -> str:
         ocr_loss = "$0" in ocr_text_full
 
         if win_detected or ocr_win:
-            logger.info(f"[🏆] WIN detected ({'OCR' if ocr_win else 'template'})")
+            logger.info("[🏆] WIN detected (%s)", "OCR" if ocr_win else "template")
             capture_template_from_pos(win_pos, "WIN")
             return "WIN"
         if loss_detected or ocr_loss:
-            logger.info(f"[💀] LOSS detected ({'OCR' if ocr_loss else 'template'})")
+            logger.info("[💀] LOSS detected (%s)", "OCR" if ocr_loss else "template")
             capture_template_from_pos(loss_pos, "LOSS")
             return "LOSS"
 
         if DEBUG_MODE:
             logger.debug("[ℹ️] No result detected this round")
     except Exception as e:
-        logger.exception(f"[❌] Detection failed: {e}")
+        logger.exception("[❌] Detection failed: %s", e)
     return None
 
 # ---------------------------
 # Monitoring thread
 # ---------------------------
-def _monitor_trade(trade_id: str, expiry_timestamp: float = None):
-    logger.info(f"[🔎] Starting monitor for {trade_id}")
-
-    if expiry_timestamp:
-        now = time.time()
-        wait = expiry_timestamp - now - 1
-        if wait > 0:
-            logger.info(f"[⏳] Waiting {wait:.2f}s before detection phase")
-            time.sleep(wait)
-
-    logger.info(f"[⚡] Trade {trade_id}: detection window active (3s pre + 3s post expiry)")
-    end_time = (expiry_timestamp or time.time()) + SCAN_DURATION_POST
-    scan_count = 0
-    start_time = time.time()
-
-    while time.time() < end_time:
-        result = _cv_detect_result(trade_id)
-        scan_count += 1
+class ResultMonitor:
+    """
+    One daemon thread watching every live trade. Trades wait in a min-heap keyed by
+    the opening of their detection window; while any window is open the thread
+    scans once per FAST_SCAN_INTERVAL and hands the result to every open trade.
+    """
+    def __init__(self):
+        self._heap = []  # (window opens, seq, trade_id, window closes)
+        self._seq = itertools.count()
+        self._cv = threading.Condition()
+        self._warm = False
+        self._active = {}  # trade_id -> (window closes, window opened); monitor thread only
+        self._thread = threading.Thread(target=self._run, name="win-loss-monitor", daemon=True)
+        self._thread.start()
+
+    def add(self, trade_id: str, expiry_deadline: float = None):
+        """expiry_deadline is on the time.monotonic() clock, so wall-clock steps can't move the window."""
+        expiry = expiry_deadline or time.monotonic()
+        with self._cv:
+            heapq.heappush(self._heap, (expiry - 1, next(self._seq), trade_id, expiry + SCAN_DURATION_POST))
+            self._warm = True
+            self._cv.notify()
+
+    def _run(self):
+        # Linux threads inherit their creator's scheduling policy; OpenCV/OCR work (and the
+        # tesseract processes it forks) must never run real-time and starve the display
+        if hasattr(os, "sched_setscheduler"):
+            try:
+                os.sched_setscheduler(threading.get_native_id(), os.SCHED_OTHER, os.sched_param(0))
+            except OSError:
+                pass
+        while True:
+            opened = []
+            with self._cv:
+                while True:
+                    now = time.monotonic()
+                    while self._heap and self._heap[0][0] <= now:
+                        _, _, trade_id, end_time = heapq.heappop(self._heap)
+                        opened.append((trade_id, end_time))
+                    if opened or self._active or self._warm:
+                        break
+                    self._cv.wait(self._heap[0][0] - now if self._heap else None)
+                warm, self._warm = self._warm, False
+
+            if warm:
+                # Pre-warm the template cache while trades wait, so the first scan doesn't pay for disk reads
+                _get_templates(WIN_TEMPLATE_DIR)
+                _get_templates(LOSS_TEMPLATE_DIR)
+            for trade_id, end_time in opened:
+                logger.info("[⚡] Trade %s: detection window active (3s pre + 3s post expiry)", trade_id)
+                self._active[trade_id] = (end_time, time.monotonic())
+            if self._active:
+                self._scan()
+                time.sleep(FAST_SCAN_INTERVAL)
+
+    def _scan(self):
+        result = _cv_detect_result(next(iter(self._active)))
         if DEBUG_MODE:
-            logger.debug(f"[🔁] Scan #{scan_count} result={result}")
+            logger.debug("[🔁] Scan for %d trade(s) result=%s", len(self._active), result)
+        now = time.monotonic()
+        settled = []
+        for trade_id, (end_time, started) in self._active.items():
+            if result:
+                logger.info("[📣] Trade %s: detected %s after %.2fs", trade_id, result, now - started)
+                settled.append((trade_id, result))
+            elif now >= end_time:
+                logger.warning("[⚠️] Trade %s: no result detected after %ss", trade_id, SCAN_DURATION_PRE + SCAN_DURATION_POST)
+                settled.append((trade_id, "NO_RESULT"))
+        for trade_id, outcome in settled:
+            del self._active[trade_id]
+            shared.trade_manager.trade_result_received(trade_id, outcome)
 
-        if result:
-            logger.info(f"[📣] Trade {trade_id}: detected {result} after {time.time()-start_time:.2f}s")
-            shared.trade_manager.trade_result_received(trade_id, result)
-            return
-        time.sleep(FAST_SCAN_INTERVAL)
+_result_monitor = None
+_result_monitor_lock = threading.Lock()
 
-    logger.warning(f"[⚠️] Trade {trade_id}: no result detected after {SCAN_DURATION_PRE + SCAN_DURATION_POST}s")
-    shared.trade_manager.trade_result_received(trade_id, "NO_RESULT")
+def _get_result_monitor() -> ResultMonitor:
+    global _result_monitor
+    if _result_monitor is None:
+        with _result_monitor_lock:
+            if _result_monitor is None:
+                _result_monitor = ResultMonitor()
+    return _result_monitor
 
 # ---------------------------
 # Public API
 # ---------------------------
-def start_trade_result_monitor(trade_id: str, expiry_timestamp: float = None):
-    logger.info(f"[🧠] Starting monitor thread for {trade_id}, expiry={expiry_timestamp}")
-    t = threading.Thread(target=_monitor_trade, args=(trade_id, expiry_timestamp), daemon=True)
-    t.start()
-    logger.info(f"[🚀] Detection thread launched for {trade_id}")
-    
+def start_trade_result_monitor(trade_id: str, expiry_deadline: float = None):
+    if expiry_deadline:
+        logger.info("[🧠] Queued result monitoring for %s, expires in %.1fs", trade_id, expiry_deadline - time.monotonic())
+    else:
+        logger.info("[🧠] Queued result monitoring for %s, no expiry given", trade_id)
+    _get_result_monitor().add(trade_id, expiry_deadline)